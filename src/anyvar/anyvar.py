@@ -3,23 +3,34 @@ biological sequence variation
 
 """
 
+import functools
 import importlib.util
 import logging
 import logging.config
 import os
 import pathlib
 import warnings
-from collections.abc import MutableMapping
+from collections import ChainMap
+from collections.abc import Iterable, MutableMapping
 from urllib.parse import urlparse
 
 import yaml
+from ga4gh.core import is_ga4gh_identifier
+from ga4gh.core.pydantic import get_pydantic_root
 from ga4gh.vrs import vrs_deref, vrs_enref
+from ga4gh.vrs.models import class_refatt_map
 
 from anyvar.storage import DEFAULT_STORAGE_URI, _Storage
 from anyvar.translate.translate import _Translator
 from anyvar.translate.vrs_python import VrsPythonTranslator
 from anyvar.utils.types import VrsObject
 
+# Use the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # Suppress pydantic warnings unless otherwise indicated
 if os.environ.get("ANYVAR_SHOW_PYDANTIC_WARNINGS", None) is None:
     warnings.filterwarnings("ignore", module="pydantic")
@@ -29,7 +40,7 @@ logging_config_file = os.environ.get("ANYVAR_LOGGING_CONFIG", None)
 if logging_config_file and pathlib.Path(logging_config_file).is_file():
     with pathlib.Path(logging_config_file).open() as fd:
         try:
-            config = yaml.safe_load(fd.read())
+            config = yaml.load(fd, Loader=_YamlLoader)
             logging.config.dictConfig(config)
         except Exception:
             logging.exception("Error in Logging Configuration. Using default configs")
@@ -79,11 +90,19 @@ def create_translator() -> _Translator:
     return VrsPythonTranslator()
 
 
+@functools.cache
+def _has_queueing_modules() -> bool:
+    """Determine whether the optional modules for task queueing are installed. Module
+    lookups hit the filesystem and cannot change for a running process, so the
+    result is cached.
+    """
+    return importlib.util.find_spec("celery") is not None
+
+
 def has_queueing_enabled() -> bool:
     """Determine whether or not asynchronous task queueing is enabled"""
     return (
-        importlib.util.find_spec("aiofiles") is not None
-        and importlib.util.find_spec("celery") is not None
+        _has_queueing_modules()
         and os.environ.get("CELERY_BROKER_URL", "") != ""
         and os.environ.get("ANYVAR_VCF_ASYNC_WORK_DIR", "") != ""
     )
@@ -127,3 +146,30 @@ class AnyVar:
         """
         v = self.object_store[object_id]
         return vrs_deref(v, self.object_store) if deref else v
+
+    def get_objects(
+        self, object_ids: Iterable[str], deref: bool = False
+    ) -> list[VrsObject]:
+        """Retrieve many registered objects, reading them from the object store in bulk.
+
+        :param object_ids: object identifiers
+        :param deref: if True, dereference all IDs contained by the objects
+        :return: objects in the order requested, skipping IDs that are not registered
+        """
+        object_ids = list(object_ids)
+        objects = self.object_store.get_objects(object_ids)
+        if not deref:
+            return [objects[i] for i in object_ids if i in objects]
+
+        # prefetch referenced objects (eg locations) in bulk, falling back to the
+        # object store for anything deeper
+        ref_ids = set()
+        for v in objects.values():
+            for attr in class_refatt_map.get(v.type, []):
+                refs = getattr(v, attr)
+                for ref in refs if isinstance(refs, list) else [refs]:
+                    if is_ga4gh_identifier(ref):
+                        ref_ids.add(str(get_pydantic_root(ref)))
+        ref_objects = self.object_store.get_objects(ref_ids - objects.keys())
+        lookup = ChainMap(objects, ref_objects, self.object_store)
+        return [vrs_deref(objects[i], lookup) for i in object_ids if i in objects]
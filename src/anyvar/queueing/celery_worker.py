@@ -1,14 +1,13 @@
 """Define the Celery app and tasks for asynchronous request-response support"""
 
-import datetime
 import logging
 import os
 import threading
+import time
 from pathlib import Path
 
 import celery.signals
 from celery import Celery, Task
-from celery.result import AsyncResult
 
 import anyvar
 from anyvar.extras.vcf import VcfRegistrar
@@ -16,10 +15,11 @@ from anyvar.extras.vcf import VcfRegistrar
 _logger = logging.getLogger(__name__)
 
 # Configure the Celery app
+_task_default_queue = os.environ.get("CELERY_TASK_DEFAULT_QUEUE", "anyvar_q")
 celery_app = Celery("anyvar")
 celery_app.conf.update(
     # general settings
-    task_default_queue=os.environ.get("CELERY_TASK_DEFAULT_QUEUE", "anyvar_q"),
+    task_default_queue=_task_default_queue,
     event_queue_prefix=os.environ.get("CELERY_EVENT_QUEUE_PREFIX", "anyvar_ev"),
     task_serializer="json",
     result_serializer="json",
@@ -31,6 +31,13 @@ celery_app.conf.update(
     result_expires=int(os.environ.get("CELERY_RESULT_EXPIRES", "7200")),
     # task settings
     task_ignore_result=False,
+    # VCF annotation is long running, so it can be routed to its own queue and
+    #   served by workers tuned for it without blocking other tasks
+    task_routes={
+        "anyvar.queueing.celery_worker.annotate_vcf": {
+            "queue": os.environ.get("ANYVAR_VCF_ASYNC_TASK_QUEUE", _task_default_queue)
+        }
+    },
     task_acks_late=os.environ.get("CELERY_TASK_ACKS_LATE", "true").lower()
     in ["true", "yes", "1"],
     task_reject_on_worker_lost=os.environ.get(
@@ -47,6 +54,11 @@ celery_app.conf.update(
         "CELERY_WORKER_SEND_TASK_EVENTS", "false"
     ).lower()
     in ["true", "yes", "1"],
+    # pool processes create the AnyVar app before reporting that they are up, so
+    #   allow more than Celery's 4 second default for that
+    worker_proc_alive_timeout=float(
+        os.environ.get("CELERY_WORKER_PROC_ALIVE_TIMEOUT", "60")
+    ),
 )
 
 # if this is a celery worker, we need an AnyVar app instance
@@ -72,8 +84,7 @@ def get_anyvar_app() -> anyvar.AnyVar:
             translator = anyvar.anyvar.create_translator()
             anyvar_instance = anyvar.AnyVar(object_store=storage, translator=translator)
             _anyvar_app = anyvar_instance
-
-    return _anyvar_app
+        return _anyvar_app
 
 
 def maybe_teardown_anyvar_app() -> None:
@@ -119,6 +130,21 @@ def exit_task() -> None:
         _current_task_count = _current_task_count - 1
 
 
+@celery.signals.worker_process_init.connect
+def on_worker_process_init(**kwargs) -> None:  # noqa: ARG001
+    """On the `worker_process_init` signal, create the AnyVar app so that the first task
+    does not pay for opening database and SeqRepo connections.
+    This signal is dispatched in the forked worker processes in the prefork pool, before
+    the process reports that it is up, so it must finish within `worker_proc_alive_timeout`.
+    """
+    _logger.info("processing signal worker_process_init")
+    try:
+        get_anyvar_app()
+    except Exception:
+        # the app is created on demand by the first task if warm up fails
+        _logger.exception("failed to create AnyVar app on worker process init")
+
+
 @celery.signals.worker_shutting_down.connect
 def on_worker_shutting_down(**kwargs) -> None:  # noqa: ARG001
     """On the `worker_shutting_down` signal, set the cleanup flag and attempt tear down.
@@ -179,7 +205,7 @@ def annotate_vcf(
     """
     try:
         enter_task()
-        task_start = datetime.datetime.now(tz=datetime.UTC)
+        task_start = time.monotonic_ns()
 
         # create output file path
         output_file_path = f"{input_file_path}_outputvcf"
@@ -199,28 +225,28 @@ def annotate_vcf(
             compute_for_ref=for_ref,
             assembly=assembly,
         )
-        elapsed = datetime.datetime.now(tz=datetime.UTC) - task_start
+        elapsed = (time.monotonic_ns() - task_start) // 1_000_000_000
         _logger.info(
-            "%s - annotation completed in %s seconds", self.request.id, elapsed.seconds
+            "%s - annotation completed in %s seconds", self.request.id, elapsed
         )
 
         # wait for writes if necessary
         if not allow_async_write:
-            _logger.info(
+            _logger.debug(
                 "%s - waiting for object store writes from celery worker method",
                 self.request.id,
             )
-            write_start = datetime.datetime.now(tz=datetime.UTC)
+            write_start = time.monotonic_ns()
             anyvar_app.object_store.wait_for_writes()
-            elapsed = datetime.datetime.now(tz=datetime.UTC) - write_start
-            _logger.info(
+            elapsed = (time.monotonic_ns() - write_start) // 1_000_000_000
+            _logger.debug(
                 "%s - waited for object store writes for %s seconds",
                 self.request.id,
-                elapsed.seconds,
+                elapsed,
             )
 
         # remove input file
-        Path(input_file_path).unlink()
+        Path(input_file_path).unlink(missing_ok=True)
 
         # return output file path
         return output_file_path
@@ -244,6 +270,7 @@ def update_sent_state(sender: str | None, headers: dict | None, **kwargs) -> Non
     task = celery_app.tasks.get(sender)
     backend = task.backend if task else celery_app.backend
 
-    result = AsyncResult(id=headers["id"])
-    if result.status == "PENDING":
+    # a fast worker may already have stored a final state for the task, which
+    #   must not be overwritten, so check the state before marking it as SENT
+    if backend.get_state(headers["id"]) == "PENDING":
         backend.store_result(headers["id"], None, "SENT")
@@ -8,9 +8,11 @@ import os
 import pathlib
 import tempfile
 import uuid
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
 from http import HTTPStatus
+from typing import BinaryIO, Literal
 
+import anyio.to_thread
 import ga4gh.vrs
 from fastapi import (
     BackgroundTasks,
@@ -25,8 +27,10 @@ from fastapi import (
     UploadFile,
     status,
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from pydantic import StrictStr
+from starlette.background import BackgroundTask
 
 import anyvar
 from anyvar.anyvar import AnyVar
@@ -52,8 +56,7 @@ from anyvar.translate.translate import (
 from anyvar.utils.types import VrsVariation, variation_class_map
 
 try:
-    import aiofiles  # noqa: I001
-    import anyvar.queueing.celery_worker
+    import anyvar.queueing.celery_worker  # noqa: I001
     from billiard.exceptions import TimeLimitExceeded
     from celery.exceptions import WorkerLostError
     from celery.result import AsyncResult
@@ -62,19 +65,42 @@ except ImportError:
 
 _logger = logging.getLogger(__name__)
 
+# seconds to wait between status checks of a PENDING run, which may just not have
+#  been marked as SENT yet; adds up to half a second in total
+_PENDING_RECHECK_DELAYS = (0.02, 0.05, 0.1, 0.33)
+
+# run ids are checked against this before any call to the Celery backend
+_RUN_ID_PATTERN = r"^[\w.:@+-]+$"
+
 
 @asynccontextmanager
 async def app_lifespan(param_app: FastAPI):  # noqa: ANN201
     """Initialize AnyVar instance and associate with FastAPI app on startup
     and teardown the AnyVar instance on shutdown
     """
+    # size the threadpool that runs synchronous route handlers
+    threadpool_size = os.environ.get("ANYVAR_THREADPOOL_SIZE")
+    if threadpool_size:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = int(threadpool_size)
+        _logger.debug("set threadpool size to %s", limiter.total_tokens)
+
     # create anyvar instance
     storage = anyvar.anyvar.create_storage()
     translator = anyvar.anyvar.create_translator()
     anyvar_instance = AnyVar(object_store=storage, translator=translator)
 
-    # associate anyvar with the app state
+    # associate anyvar and a VCF registrar for it with the app state
     param_app.state.anyvar = anyvar_instance
+    param_app.state.vcf_registrar = VcfRegistrar(anyvar_instance)
+    param_app.state.vcf_annotate_lock = asyncio.Lock()
+
+    # optionally cap the number of VCF uploads handled at once by this process;
+    #  unset or a value of 0 or less means no limit
+    vcf_max_concurrent = int(os.environ.get("ANYVAR_VCF_MAX_CONCURRENT") or "0")
+    param_app.state.vcf_semaphore = (
+        asyncio.Semaphore(vcf_max_concurrent) if vcf_max_concurrent > 0 else None
+    )
 
     yield
 
@@ -233,9 +259,9 @@ def register_vrs_object(
         )
         return result
 
-    variation_object = variation_class_map[variation_type](**variation.dict())
-    v_id = av.put_object(variation_object)
-    result["object"] = variation_object
+    # the request body is already validated into a VRS-Python model
+    v_id = av.put_object(variation)
+    result["object"] = variation
     result["object_id"] = v_id
     return result
 
@@ -250,7 +276,6 @@ def register_vrs_object(
 async def annotate_vcf(
     request: Request,
     response: Response,
-    bg_tasks: BackgroundTasks,
     vcf: UploadFile = File(..., description="VCF to register and annotate"),
     for_ref: bool = Query(
         default=True, description="Whether to compute VRS IDs for REF alleles"
@@ -259,9 +284,8 @@ async def annotate_vcf(
         default=False,
         description="Whether to allow asynchronous write of VRS objects to database",
     ),
-    assembly: str = Query(
+    assembly: Literal["GRCh38", "GRCh37"] = Query(
         default="GRCh38",
-        pattern="^(GRCh38|GRCh37)$",
         description="The reference assembly for the VCF",
     ),
     run_async: bool = Query(
@@ -270,6 +294,8 @@ async def annotate_vcf(
     ),
     run_id: str | None = Query(
         default=None,
+        max_length=255,
+        pattern=_RUN_ID_PATTERN,
         description="When running asynchronously, use the specified value as the run id instead generating a random uuid",
     ),
 ) -> FileResponse | RunStatusResponse | ErrorResponse:
@@ -277,7 +303,6 @@ async def annotate_vcf(
 
     :param request: FastAPI request object
     :param response: FastAPI response object
-    :param bg_tasks: FastAPI background tasks object
     :param vcf: incoming VCF file object
     :param for_ref: whether to compute VRS IDs for REF alleles
     :param allow_async_write: whether to allow async database writes
@@ -293,31 +318,67 @@ async def annotate_vcf(
             error="Required modules and/or configurations for asynchronous VCF annotation are missing"
         )
 
-    # ensure the temporary file is flushed to disk
-    vcf.file.rollover()
-
-    # Submit asynchronous run
-    if run_async:
-        return await _annotate_vcf_async(
-            response=response,
-            vcf=vcf,
-            for_ref=for_ref,
-            allow_async_write=allow_async_write,
-            assembly=assembly,
-            run_id=run_id,
-        )
-    # Run synchronously
-    else:  # noqa: RET505
-        return await _annotate_vcf_sync(
-            request=request,
-            response=response,
-            bg_tasks=bg_tasks,
-            vcf=vcf,
-            for_ref=for_ref,
-            allow_async_write=allow_async_write,
-            assembly=assembly,
+    # If the configured number of VCF uploads are already in progress, shed load
+    semaphore: asyncio.Semaphore | None = request.app.state.vcf_semaphore
+    if semaphore is not None and semaphore.locked():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        response.headers["Retry-After"] = "5"
+        return ErrorResponse(
+            error="Too many VCF uploads are in progress. Try again later.",
+            error_code="TOO_MANY_VCF_UPLOADS",
         )
 
+    async with semaphore or nullcontext():
+        # ensure the temporary file is flushed to disk
+        await run_in_threadpool(vcf.file.rollover)
+
+        # Submit asynchronous run
+        if run_async:
+            return await _annotate_vcf_async(
+                response=response,
+                vcf=vcf,
+                for_ref=for_ref,
+                allow_async_write=allow_async_write,
+                assembly=assembly,
+                run_id=run_id,
+            )
+        # Run synchronously
+        else:  # noqa: RET505
+            return await _annotate_vcf_sync(
+                request=request,
+                response=response,
+                vcf=vcf,
+                for_ref=for_ref,
+                allow_async_write=allow_async_write,
+                assembly=assembly,
+            )
+
+
+def _copy_vcf(src: BinaryIO, dest: pathlib.Path) -> int:
+    """Copy an uploaded VCF file and count its sites in a single pass. Blocks on file
+    I/O, so async routes should run it in the threadpool.
+
+    :param src: uploaded VCF file object
+    :param dest: path to copy the VCF to
+    :return: number of data (non-header) lines in the VCF
+    """
+    src.seek(0)
+    # count data lines, leaving out "#" header lines including ones split across reads
+    vcf_site_count = 0
+    last_byte = b"\n"
+    with dest.open(mode="wb") as fd:
+        while buffer := src.read(1024 * 1024):
+            header_count = buffer.count(b"\n#")
+            if last_byte == b"\n" and buffer[:1] == b"#":
+                header_count += 1
+            vcf_site_count += buffer.count(b"\n") - header_count
+            last_byte = buffer[-1:]
+            fd.write(buffer)
+    # count a final line that is not newline terminated
+    if last_byte != b"\n":
+        vcf_site_count += 1
+    return vcf_site_count
+
 
 async def _annotate_vcf_async(
     response: Response,
@@ -330,35 +391,30 @@ async def _annotate_vcf_async(
     """Annotate with VRS IDs asynchronously.  See `annotate_vcf()` for parameter definitions."""
     # if run_id is provided, validate it does not already exist
     if run_id:
-        existing_result = AsyncResult(id=run_id)
-        if existing_result.status != "PENDING":
+        _, existing_status = await run_in_threadpool(_get_run_status, run_id)
+        if existing_status != "PENDING":
             response.status_code = status.HTTP_400_BAD_REQUEST
             return ErrorResponse(
-                error=f"An existing run with id {run_id} is {existing_result.status}.  Fetch the completed run result before submitting with the same run_id."
+                error=f"An existing run with id {run_id} is {existing_status}.  Fetch the completed run result before submitting with the same run_id."
             )
 
     # write file to shared storage area with a directory for each day and a random file name
     async_work_dir = os.environ.get("ANYVAR_VCF_ASYNC_WORK_DIR", None)
     utc_now = datetime.datetime.now(tz=datetime.UTC)
     file_id = str(uuid.uuid4())
-    input_file_path = pathlib.Path(
-        f"{async_work_dir}/{utc_now.year}{utc_now.month}{utc_now.day}/{file_id}"
+    input_file_path = (
+        pathlib.Path(async_work_dir) / utc_now.strftime("%Y%m%d") / file_id
     )
-    if not input_file_path.parent.exists():
-        input_file_path.parent.mkdir(parents=True)
+    input_file_path.parent.mkdir(parents=True, exist_ok=True)
     _logger.debug("writing working file for async vcf to %s", input_file_path)
 
-    vcf_site_count = 0
-    async with aiofiles.open(input_file_path, mode="wb") as fd:
-        while buffer := await vcf.read(1024 * 1024):
-            if ord("\n") in buffer:
-                vcf_site_count = vcf_site_count + 1
-            await fd.write(buffer)
+    vcf_site_count = await run_in_threadpool(_copy_vcf, vcf.file, input_file_path)
     _logger.debug("wrote working file for async vcf to %s", input_file_path)
     _logger.debug("vcf site count of async vcf is %s", vcf_site_count)
 
-    # submit async job
-    task_result = anyvar.queueing.celery_worker.annotate_vcf.apply_async(
+    # submit async job; publishing to the broker blocks, so keep it off the event loop
+    task_result = await run_in_threadpool(
+        anyvar.queueing.celery_worker.annotate_vcf.apply_async,
         kwargs={
             "input_file_path": str(input_file_path),
             "assembly": assembly,
@@ -377,8 +433,8 @@ async def _annotate_vcf_async(
     response.status_code = status.HTTP_202_ACCEPTED
     response.headers["Location"] = f"/vcf/{task_result.id}"
     # low side estimate for time is 333 variants per second
-    retry_after = max(1, round((vcf_site_count * (2 if for_ref else 1)) / 333, 0))
-    _logger.debug("%s - retry after is %s", task_result.id, str(retry_after))
+    retry_after = max(1, round((vcf_site_count * (2 if for_ref else 1)) / 333))
+    _logger.debug("%s - retry after is %s", task_result.id, retry_after)
     response.headers["Retry-After"] = str(retry_after)
     return RunStatusResponse(
         run_id=task_result.id,
@@ -390,7 +446,6 @@ async def _annotate_vcf_async(
 async def _annotate_vcf_sync(
     request: Request,
     response: Response,
-    bg_tasks: BackgroundTasks,
     vcf: UploadFile,
     for_ref: bool,
     allow_async_write: bool,
@@ -398,29 +453,51 @@ async def _annotate_vcf_sync(
 ) -> FileResponse | ErrorResponse:
     """Annotate with VRS IDs synchronously.  See `annotate_vcf()` for parameter definitions."""
     av: AnyVar = request.app.state.anyvar
-    registrar = VcfRegistrar(av)
+    registrar: VcfRegistrar = request.app.state.vcf_registrar
     with tempfile.NamedTemporaryFile(delete=False) as temp_out_file:
-        try:
-            registrar.annotate(
-                vcf.file.name,
-                vcf_out=temp_out_file.name,
-                compute_for_ref=for_ref,
-                assembly=assembly,
-            )
-        except (TranslatorConnectionError, OSError) as e:
-            _logger.error("Encountered error during VCF registration: %s", e)
-            response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
-            return ErrorResponse(error="VCF registration failed.")
-        except ValueError as e:
-            _logger.error("Encountered error during VCF registration: %s", e)
-            response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
-            return ErrorResponse(error="Encountered ValueError when registering VCF")
-
-        if not allow_async_write:
-            _logger.info("Waiting for object store writes from API handler method")
-            av.object_store.wait_for_writes()
-        bg_tasks.add_task(os.unlink, temp_out_file.name)
-        return FileResponse(temp_out_file.name)
+        # run sync annotations one at a time per process, as they did when they ran
+        #  on the event loop, so they do not compete for the shared batch writer
+        async with request.app.state.vcf_annotate_lock:
+            try:
+                # annotation is long-running blocking work, so keep it off the event loop
+                await run_in_threadpool(
+                    registrar.annotate,
+                    vcf.file.name,
+                    vcf_out=temp_out_file.name,
+                    compute_for_ref=for_ref,
+                    assembly=assembly,
+                )
+            except (TranslatorConnectionError, OSError) as e:
+                _logger.error("Encountered error during VCF registration: %s", e)
+                response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+                return ErrorResponse(error="VCF registration failed.")
+            except ValueError as e:
+                _logger.error("Encountered error during VCF registration: %s", e)
+                response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+                return ErrorResponse(
+                    error="Encountered ValueError when registering VCF"
+                )
+
+            if not allow_async_write:
+                _logger.info("Waiting for object store writes from API handler method")
+                await run_in_threadpool(av.object_store.wait_for_writes)
+        return FileResponse(
+            temp_out_file.name,
+            background=BackgroundTask(os.unlink, temp_out_file.name),
+        )
+
+
+def _get_run_status(run_id: str) -> tuple["AsyncResult", str]:
+    """Look up an asynchronous run and its current status.
+
+    This makes a blocking call to the Celery result backend, so async routes should
+    run it in the threadpool.
+
+    :param run_id: asynchronous run id
+    :return: the run's Celery result and its status
+    """
+    async_result = AsyncResult(id=run_id)
+    return async_result, async_result.status
 
 
 @app.get(
@@ -433,7 +510,11 @@ async def _annotate_vcf_sync(
 async def get_result(
     response: Response,
     bg_tasks: BackgroundTasks,
-    run_id: str = Path(description="The run id to retrieve the result or status for"),
+    run_id: str = Path(
+        max_length=255,
+        pattern=_RUN_ID_PATTERN,
+        description="The run id to retrieve the result or status for",
+    ),
 ) -> RunStatusResponse | FileResponse | ErrorResponse:
     """Return the status or result of an asynchronous registration of alleles from a VCF file.
     :param response: FastAPI response object
@@ -448,22 +529,24 @@ async def get_result(
             error="Required modules and/or configurations for asynchronous VCF annotation are missing"
         )
 
-    # get the async result
-    async_result = AsyncResult(id=run_id)
-    _logger.debug("%s - status is %s", run_id, async_result.status)
+    # get the async result; once it is ready, result and kwargs are cached on it
+    async_result, run_status = await run_in_threadpool(_get_run_status, run_id)
+    _logger.debug("%s - status is %s", run_id, run_status)
 
     # completed successfully
-    if async_result.status == "SUCCESS":
+    if run_status == "SUCCESS":
         response.status_code = status.HTTP_200_OK
         output_file_path = async_result.result
-        async_result.forget()
+        await run_in_threadpool(async_result.forget)
         _logger.debug("%s - output file path is %s", run_id, output_file_path)
-        bg_tasks.add_task(os.unlink, output_file_path)
-        return FileResponse(path=output_file_path)
+        return FileResponse(
+            path=output_file_path,
+            background=BackgroundTask(os.unlink, output_file_path),
+        )
 
     # failed - return an error response
     elif (  # noqa: RET505
-        async_result.status == "FAILURE"
+        run_status == "FAILURE"
         and async_result.result
         and isinstance(async_result.result, Exception)
     ):
@@ -502,7 +585,7 @@ async def get_result(
                     bg_tasks.add_task(output_file_path.unlink, missing_ok=True)
 
         # forget the run and return the response
-        async_result.forget()
+        await run_in_threadpool(async_result.forget)
         response.status_code = int(
             os.environ.get("ANYVAR_VCF_ASYNC_FAILURE_STATUS_CODE", "500")
         )
@@ -513,16 +596,18 @@ async def get_result(
         # the after_task_publish handler sets the state to "SENT"
         #  so a status of PENDING is actually unknown task
         # but there can be a race condition, so if status is pending
-        #  pause half a second and check again
-        if async_result.status == "PENDING":
-            await asyncio.sleep(0.5)
-            async_result = AsyncResult(id=run_id)
+        #  keep checking with a short backoff for up to half a second
+        for delay in _PENDING_RECHECK_DELAYS:
+            if run_status != "PENDING":
+                break
+            await asyncio.sleep(delay)
+            _, run_status = await run_in_threadpool(_get_run_status, run_id)
             _logger.debug(
-                "%s - after 0.5 second wait, status is %s", run_id, async_result.status
+                "%s - after %s second wait, status is %s", run_id, delay, run_status
             )
 
         # status is "PENDING" - unknown run id
-        if async_result.status == "PENDING":
+        if run_status == "PENDING":
             response.status_code = status.HTTP_404_NOT_FOUND
             return RunStatusResponse(
                 run_id=run_id,
@@ -621,11 +706,9 @@ def search_variations(
 
     inline_alleles = []
     if alleles:
-        for allele in alleles:
-            var_object = av.get_object(allele["id"], deref=True)
-            if not var_object:
-                continue
-            inline_alleles.append(var_object)
+        inline_alleles = av.get_objects(
+            [allele["id"] for allele in alleles], deref=True
+        )
 
     return {"variations": inline_alleles}
 
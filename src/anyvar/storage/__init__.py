@@ -3,8 +3,9 @@
 DEFAULT_STORAGE_URI = "postgresql://postgres@localhost:5432/anyvar"
 
 from abc import abstractmethod
-from collections.abc import MutableMapping
+from collections.abc import Iterable, MutableMapping
 from contextlib import AbstractContextManager
+from typing import Any
 
 from anyvar.restapi.schema import VariationStatisticType
 
@@ -14,6 +15,20 @@ class _Storage(MutableMapping):
 
     batch_manager = None
 
+    def get_objects(self, names: Iterable[str]) -> dict[str, Any]:
+        """Fetch many objects at once. The default implementation fetches each object
+        individually; backends that support bulk reads should override it.
+
+        :param names: object IDs to fetch
+        :return: mapping of object ID to object for each ID that is available
+        """
+        objects = {}
+        for name in names:
+            value = self.get(name)
+            if value is not None:
+                objects[name] = value
+        return objects
+
     @abstractmethod
     def search_variations(self, refget_accession: str, start: int, stop: int) -> list:
         """Find all registered variations in a provided genomic region
@@ -1,6 +1,5 @@
 """Provide PostgreSQL-based storage implementation."""
 
-import json
 from io import StringIO
 from typing import Any
 
@@ -24,6 +23,7 @@ class PostgresObjectStore(SqlStorage):
         table_name: str | None = None,
         max_pending_batches: int | None = None,
         flush_on_batchctx_exit: bool | None = None,
+        cache_size: int | None = None,
     ) -> None:
         """Initialize DB handler."""
         super().__init__(
@@ -32,6 +32,7 @@ class PostgresObjectStore(SqlStorage):
             table_name,
             max_pending_batches,
             flush_on_batchctx_exit,
+            cache_size,
         )
 
     def create_schema(self, db_conn: Connection) -> None:
@@ -60,7 +61,7 @@ class PostgresObjectStore(SqlStorage):
         :param value: value for `vrs_object` field
         """
         insert_query = f"INSERT INTO {self.table_name} (vrs_id, vrs_object) VALUES (:vrs_id, :vrs_object) ON CONFLICT DO NOTHING"  # noqa: S608
-        value_json = json.dumps(value.model_dump(exclude_none=True))
+        value_json = value.model_dump_json(exclude_none=True)
         db_conn.execute(
             sql_text(insert_query), {"vrs_id": name, "vrs_object": value_json}
         )
@@ -81,10 +82,10 @@ class PostgresObjectStore(SqlStorage):
         drop_statement = "DROP TABLE tmp_table"
         db_conn.execute(sql_text(tmp_statement))
         with db_conn.connection.cursor() as cur:
-            row_data = [
-                f"{name}\t{json.dumps(value.model_dump(exclude_none=True))}"
-                for name, value in items
-            ]
+            row_data = []
+            for name, value in items:
+                value_json = value.model_dump_json(exclude_none=True)
+                row_data.append(f"{name}\t{value_json}")
             fl = StringIO("\n".join(row_data))
             cur.copy_from(fl, "tmp_table", columns=["vrs_id", "vrs_object"])
             fl.close()
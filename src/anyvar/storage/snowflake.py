@@ -1,6 +1,5 @@
 """Provide Snowflake-based storage implementation."""
 
-import json
 import logging
 import os
 from enum import Enum, auto
@@ -8,6 +7,7 @@ from pathlib import Path
 from typing import Any
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
+import orjson
 import snowflake.connector
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
@@ -75,6 +75,7 @@ class SnowflakeObjectStore(SqlStorage):
         max_pending_batches: int | None = None,
         flush_on_batchctx_exit: bool | None = None,
         batch_add_mode: SnowflakeBatchAddMode | None = None,
+        cache_size: int | None = None,
     ) -> None:
         """:param batch_add_mode: what type of SQL statement to use when adding many items at one; one of `merge`
         (no duplicates), `insert_notin` (try to avoid duplicates) or `insert` (don't worry about duplicates);
@@ -87,6 +88,7 @@ class SnowflakeObjectStore(SqlStorage):
             table_name,
             max_pending_batches,
             flush_on_batchctx_exit,
+            cache_size,
         )
         env_batch_mode_name = os.environ.get(
             "ANYVAR_SNOWFLAKE_BATCH_ADD_MODE", SnowflakeBatchAddMode.merge.name
@@ -175,7 +177,7 @@ class SnowflakeObjectStore(SqlStorage):
             MERGE INTO {self.table_name} t USING (SELECT ? AS vrs_id, ? AS vrs_object) s ON t.vrs_id = s.vrs_id
             WHEN NOT MATCHED THEN INSERT (vrs_id, vrs_object) VALUES (s.vrs_id, PARSE_JSON(s.vrs_object))
             """  # noqa: S608
-        value_json = json.dumps(value.model_dump(exclude_none=True))
+        value_json = value.model_dump_json(exclude_none=True)
         db_conn.execute(insert_query, (name, value_json))
         _logger.debug("Inserted item %s to %s", name, self.table_name)
 
@@ -213,7 +215,8 @@ class SnowflakeObjectStore(SqlStorage):
         for name, value in items:
             if name not in row_keys:
                 row_keys.add(name)
-                row_data.append((name, json.dumps(value.model_dump(exclude_none=True))))
+                value_json = value.model_dump_json(exclude_none=True)
+                row_data.append((name, value_json))
         _logger.info("Created row data for insert, first item is %s", row_data[0])
 
         db_conn.execute(sql_text(tmp_statement))
@@ -297,4 +300,4 @@ class SnowflakeObjectStore(SqlStorage):
             query_str,
             (type, start, stop, refget_accession),
         )
-        return [json.loads(row[0]) for row in results if row]
+        return [orjson.loads(row[0]) for row in results if row]
@@ -1,26 +1,39 @@
 """Provide top level SQL storage class and methods."""
 
-import json
 import logging
 import os
 from abc import abstractmethod
-from collections.abc import Generator
-from threading import Condition, Thread
+from collections import OrderedDict
+from collections.abc import Generator, Iterable
+from threading import Condition, Lock, Thread, local
 from typing import Any
 
 import ga4gh.core
-from ga4gh.vrs import models
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import bindparam, create_engine
 from sqlalchemy import text as sql_text
 from sqlalchemy.engine import Connection
 
 from anyvar.restapi.schema import VariationStatisticType
+from anyvar.utils.types import object_class_map
 
 from . import _BatchManager, _Storage
 
 _logger = logging.getLogger(__name__)
 
 
+class _BatchState(local):
+    """Batch insert state of a SqlStorage, kept per thread so that a batch context
+    only collects the writes made by the thread that entered it
+    """
+
+    def __init__(self) -> None:
+        """Initialize batch state for a thread"""
+        self.batch_mode = False
+        self.batch_insert_values = []
+        self.batch_insert_ids = set()
+
+
 class SqlStorage(_Storage):
     """Relational database storage backend.  Uses SQLAlchemy as a DB abstraction layer and pool.
     Methods that utilize straightforward SQL are implemented in this class.  Methods that require
@@ -34,6 +47,7 @@ class SqlStorage(_Storage):
         table_name: str | None = None,
         max_pending_batches: int | None = None,
         flush_on_batchctx_exit: bool | None = None,
+        cache_size: int | None = None,
     ) -> None:
         """Initialize DB handler.
 
@@ -46,6 +60,8 @@ class SqlStorage(_Storage):
             be set with ANYVAR_SQL_STORE_MAX_PENDING_BATCHES environment variable
         :param flush_on_batchctx_exit: whether to call `wait_for_writes()` when exiting the batch manager context;
             defaults to True; can be set with the ANYVAR_SQL_STORE_FLUSH_ON_BATCHCTX_EXIT environment variable
+        :param cache_size: max number of recently read VRS objects to keep in memory, defaults to 4096; 0 disables
+            the cache; can be set with ANYVAR_SQL_STORE_CACHE_SIZE environment variable
 
         See https://docs.sqlalchemy.org/en/20/core/connections.html for connection URL info
         """
@@ -55,10 +71,17 @@ class SqlStorage(_Storage):
         )
 
         # create the database connection engine
+        pool_size = int(os.environ.get("ANYVAR_SQL_STORE_POOL_SIZE", "1"))
+        max_overflow = int(os.environ.get("ANYVAR_SQL_STORE_MAX_OVERFLOW", "1"))
+        _logger.debug(
+            "set connection pool size to %s with max overflow %s",
+            pool_size,
+            max_overflow,
+        )
         self.conn_pool = create_engine(
             db_url,
-            pool_size=1,
-            max_overflow=1,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
             pool_recycle=3600,
             connect_args=self._get_connect_args(db_url),
         )
@@ -69,8 +92,7 @@ class SqlStorage(_Storage):
 
         # setup batch handling
         self.batch_manager = SqlStorageBatchManager
-        self.batch_mode = False
-        self.batch_insert_values = []
+        self._batch_state = _BatchState()
         self.batch_limit = batch_limit or int(
             os.environ.get("ANYVAR_SQL_STORE_BATCH_LIMIT", "100000")
         )
@@ -94,6 +116,43 @@ class SqlStorage(_Storage):
         self.batch_thread = SqlStorageBatchThread(self, max_pending_batches)
         self.batch_thread.start()
 
+        # setup read cache
+        self.cache_size = (
+            int(os.environ.get("ANYVAR_SQL_STORE_CACHE_SIZE", "4096"))
+            if cache_size is None
+            else cache_size
+        )
+        _logger.debug("set cache size to %s", self.cache_size)
+        self._cache = OrderedDict()
+        self._cache_lock = Lock()
+
+    @property
+    def batch_mode(self) -> bool:
+        """Whether writes from the current thread are added to a batch"""
+        return self._batch_state.batch_mode
+
+    @batch_mode.setter
+    def batch_mode(self, value: bool) -> None:
+        self._batch_state.batch_mode = value
+
+    @property
+    def batch_insert_values(self) -> list | None:
+        """(vrs_id, vrs_object) pairs in the current thread's batch"""
+        return self._batch_state.batch_insert_values
+
+    @batch_insert_values.setter
+    def batch_insert_values(self, value: list | None) -> None:
+        self._batch_state.batch_insert_values = value
+
+    @property
+    def batch_insert_ids(self) -> set:
+        """VRS IDs in the current thread's batch"""
+        return self._batch_state.batch_insert_ids
+
+    @batch_insert_ids.setter
+    def batch_insert_ids(self, value: set) -> None:
+        self._batch_state.batch_insert_ids = value
+
     def _get_connection(self) -> Connection:
         """Return a database connection"""
         return self.conn_pool.connect()
@@ -128,7 +187,14 @@ class SqlStorage(_Storage):
             msg = "ga4gh.vrs object value required"
             raise ValueError(msg)
         name = str(name)  # in case str-like
+        # IDs are content digests, so an ID that is already stored or queued
+        #   refers to an identical object and does not need to be written again
+        if self._cache_contains(name):
+            return
         if self.batch_mode:
+            if name in self.batch_insert_ids:
+                return
+            self.batch_insert_ids.add(name)
             self.batch_insert_values.append((name, value))
             _logger.debug("Appended item %s to batch queue", name)
             if len(self.batch_insert_values) >= self.batch_limit:
@@ -138,6 +204,7 @@ class SqlStorage(_Storage):
                     len(self.batch_insert_values),
                 )
                 self.batch_insert_values = []
+                self.batch_insert_ids = set()
         else:
             with self._get_connection() as db_conn:  # noqa: SIM117
                 with db_conn.begin():
@@ -171,20 +238,101 @@ class SqlStorage(_Storage):
         :return: VRS object if available
         :raise NotImplementedError: if unsupported VRS object type (this is WIP)
         """
-        with self._get_connection() as conn:
-            result = self.fetch_vrs_object(conn, name)
+        result = self._cache_get(name)
+        if result is None:
+            with self._get_connection() as conn:
+                result = self.fetch_vrs_object(conn, name)
             if result:
-                object_type = result["type"]
-                if object_type == "Allele":
-                    return models.Allele(**result)
-                if object_type == "CopyNumberCount":
-                    return models.CopyNumberCount(**result)
-                if object_type == "CopyNumberChange":
-                    return models.CopyNumberChange(**result)
-                if object_type == "SequenceLocation":
-                    return models.SequenceLocation(**result)
-                raise NotImplementedError
-            raise KeyError(name)
+                self._cache_put(name, result)
+        if result:
+            return self._to_vrs_object(result)
+        raise KeyError(name)
+
+    def get_objects(self, names: Iterable[str]) -> dict[str, Any]:
+        """Fetch many items from the DB at once. Items already in the read cache are
+        not queried again; the rest are fetched in as few queries as possible.
+
+        :param names: keys to retrieve VRS objects for
+        :return: mapping of key to VRS object for each key that is available
+        :raise NotImplementedError: if unsupported VRS object type (this is WIP)
+        """
+        names = list(dict.fromkeys(str(name) for name in names))
+        results = {}
+        missing_names = []
+        for name in names:
+            result = self._cache_get(name)
+            if result is None:
+                missing_names.append(name)
+            else:
+                results[name] = result
+
+        if missing_names:
+            with self._get_connection() as conn:
+                fetched = self.fetch_vrs_objects(conn, missing_names)
+            for name, result in fetched.items():
+                if result:
+                    self._cache_put(name, result)
+                    results[name] = result
+
+        return {
+            name: self._to_vrs_object(results[name])
+            for name in names
+            if name in results
+        }
+
+    @staticmethod
+    def _to_vrs_object(result: dict) -> Any:  # noqa: ANN401
+        """Build a VRS-Python model from the JSON form of a stored VRS object
+
+        :param result: VRS object as a dict
+        :return: VRS object
+        :raise NotImplementedError: if unsupported VRS object type (this is WIP)
+        """
+        object_class = object_class_map.get(result["type"])
+        if object_class is None:
+            raise NotImplementedError
+        return object_class.model_validate(result)
+
+    def _cache_get(self, name: str) -> dict | None:
+        """Return the cached JSON form of a VRS object, marking it as recently used
+
+        :param name: VRS ID to look up
+        :return: VRS object as a dict if cached, None otherwise
+        """
+        if not self.cache_size:
+            return None
+        with self._cache_lock:
+            result = self._cache.get(name)
+            if result is not None:
+                self._cache.move_to_end(name)
+            return result
+
+    def _cache_contains(self, name: str) -> bool:
+        """Check whether a VRS object is in the read cache, without affecting its
+        recency
+
+        :param name: VRS ID to look up
+        :return: True if the ID is cached
+        """
+        if not self.cache_size:
+            return False
+        with self._cache_lock:
+            return name in self._cache
+
+    def _cache_put(self, name: str, value: dict) -> None:
+        """Cache the JSON form of a VRS object, evicting the least recently used
+        object if the cache is full
+
+        :param name: VRS ID
+        :param value: VRS object as a dict
+        """
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            self._cache[name] = value
+            self._cache.move_to_end(name)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
 
     def fetch_vrs_object(self, db_conn: Connection, vrs_id: str) -> Any | None:  # noqa: ANN401
         """Fetch a single VRS object from the database, return the value as a JSON object
@@ -201,9 +349,29 @@ class SqlStorage(_Storage):
         )
         if result:
             value = result.scalar()
-            return json.loads(value) if value and isinstance(value, str) else value
+            return orjson.loads(value) if value and isinstance(value, str) else value
         return None
 
+    def fetch_vrs_objects(self, db_conn: Connection, vrs_ids: list[str]) -> dict:
+        """Fetch many VRS objects from the database, return the values as JSON objects
+
+        :param db_conn: a database connection
+        :param vrs_ids: the VRS IDs
+        :return: mapping of VRS ID to VRS object for each ID that is available
+        """
+        query = sql_text(
+            f"SELECT vrs_id, vrs_object FROM {self.table_name} WHERE vrs_id IN :vrs_ids"  # noqa: S608
+        ).bindparams(bindparam("vrs_ids", expanding=True))
+        results = {}
+        # keep IN lists to a size all supported databases accept
+        for i in range(0, len(vrs_ids), 1000):
+            result = db_conn.execute(query, {"vrs_ids": vrs_ids[i : i + 1000]})
+            for vrs_id, value in result:
+                results[vrs_id] = (
+                    orjson.loads(value) if value and isinstance(value, str) else value
+                )
+        return results
+
     def __contains__(self, name: str) -> bool:
         """Check whether VRS objects table contains ID.
 
@@ -219,6 +387,8 @@ class SqlStorage(_Storage):
         :param name: key to delete object for
         """
         name = str(name)  # in case str-like
+        with self._cache_lock:
+            self._cache.pop(name, None)
         with self._get_connection() as conn:  # noqa: SIM117
             with conn.begin():
                 self.delete_vrs_object(conn, name)
@@ -345,7 +515,7 @@ class SqlStorage(_Storage):
         for row in result:
             if row:
                 value = row["vrs_object"]
-                yield json.loads(value) if value and isinstance(value, str) else value
+                yield orjson.loads(value) if value and isinstance(value, str) else value
             else:
                 yield None
 
@@ -397,6 +567,8 @@ class SqlStorage(_Storage):
 
     def wipe_db(self) -> None:
         """Remove all stored records from the database"""
+        with self._cache_lock:
+            self._cache.clear()
         with self._get_connection() as conn:  # noqa: SIM117
             with conn.begin():
                 conn.execute(sql_text(f"DELETE FROM {self.table_name}"))  # noqa: S608
@@ -412,6 +584,7 @@ class SqlStorageBatchManager(_BatchManager):
     """Context manager enabling bulk insertion statements
 
     Use in cases like VCF ingest when intaking large amounts of data at once.
+    Only writes made by the thread that entered the context are batched.
     Insertion batches are processed by a background thread.
     """
 
@@ -430,6 +603,7 @@ class SqlStorageBatchManager(_BatchManager):
     def __enter__(self) -> None:
         """Enter managed context."""
         self._storage.batch_insert_values = []
+        self._storage.batch_insert_ids = set()
         self._storage.batch_mode = True
 
     def __exit__(
@@ -447,6 +621,7 @@ class SqlStorageBatchManager(_BatchManager):
         """
         if exc_type is not None:
             self._storage.batch_insert_values = None
+            self._storage.batch_insert_ids = set()
             self._storage.batch_mode = False
             _logger.error(
                 "Sql storage batch manager encountered exception %s: %s",
@@ -458,6 +633,7 @@ class SqlStorageBatchManager(_BatchManager):
         self._storage.batch_thread.queue_batch(self._storage.batch_insert_values)
         self._storage.batch_mode = False
         self._storage.batch_insert_values = None
+        self._storage.batch_insert_ids = set()
         if self._storage.flush_on_batchctx_exit:
             _logger.debug("Flushing on batch context exit")
             self._storage.wait_for_writes()
@@ -1,5 +1,6 @@
 """Normalize incoming variation descriptions with the VRS-Python library."""
 
+import functools
 from os import environ
 
 from ga4gh.vrs import models
@@ -40,6 +41,11 @@ class VrsPythonTranslator(_Translator):
             seqrepo_proxy = create_dataproxy(seqrepo_uri)
         self.allele_tlr = AlleleTranslator(data_proxy=seqrepo_proxy)
         self.cnv_tlr = CnvTranslator(data_proxy=seqrepo_proxy)
+        # the same handful of chromosome and transcript accessions are looked up
+        #   over and over, so cache their sequence IDs per translator
+        self._cached_sequence_id = functools.lru_cache(maxsize=1024)(
+            self._lookup_sequence_id
+        )
 
     def translate_variation(
         self, var: str, **kwargs
@@ -126,7 +132,18 @@ class VrsPythonTranslator(_Translator):
         return self.allele_tlr.translate_from(coords, "gnomad", assembly_name=assembly)
 
     def get_sequence_id(self, accession_id: str) -> str:
-        """Get GA4GH sequence identifier for provided accession ID
+        """Get GA4GH sequence identifier for provided accession ID.
+
+        Results are cached per accession.
+
+        :param accession_id: ID to convert
+        :return: equivalent GA4GH sequence ID
+        :raise: KeyError if no equivalent ID is available
+        """
+        return self._cached_sequence_id(accession_id)
+
+    def _lookup_sequence_id(self, accession_id: str) -> str:
+        """Look up the GA4GH sequence identifier for provided accession ID in SeqRepo.
 
         :param accession_id: ID to convert
         :return: equivalent GA4GH sequence ID
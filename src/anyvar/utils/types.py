@@ -23,6 +23,12 @@ variation_class_map = {
     "CopyNumberChange": models.CopyNumberChange,
 }
 
+# VRS object type: VRS-Python model
+object_class_map = {
+    **variation_class_map,
+    "SequenceLocation": models.SequenceLocation,
+}
+
 
 class SupportedVariationType(StrEnum):
     """Define constraints for supported variation types"""
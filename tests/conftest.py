@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 from pathlib import Path
@@ -6,6 +7,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from anyvar.anyvar import AnyVar, create_storage, create_translator
+from anyvar.extras.vcf import VcfRegistrar
 from anyvar.restapi.main import app as anyvar_restapi
 
 pytest_plugins = ("celery.contrib.pytest",)
@@ -46,6 +48,9 @@ def storage():
 def client(storage):
     translator = create_translator()
     anyvar_restapi.state.anyvar = AnyVar(object_store=storage, translator=translator)
+    anyvar_restapi.state.vcf_registrar = VcfRegistrar(anyvar_restapi.state.anyvar)
+    anyvar_restapi.state.vcf_annotate_lock = asyncio.Lock()
+    anyvar_restapi.state.vcf_semaphore = None
     return TestClient(app=anyvar_restapi)
 
 
@@ -1,7 +1,8 @@
-import json
 import re
 import time
 
+import orjson
+
 
 class MockResult(list):
     def __init__(self, *args, **kwargs):
@@ -161,5 +162,8 @@ class MockVRSObject:
     def model_dump(self, exclude_none: bool):
         return {"id": self.id}
 
+    def model_dump_json(self, exclude_none: bool):
+        return orjson.dumps(self.model_dump(exclude_none=exclude_none)).decode()
+
     def to_json(self):
-        return json.dumps(self.model_dump(exclude_none=True))
+        return self.model_dump_json(exclude_none=True)
@@ -5,7 +5,9 @@ Uses mocks for database integration
 """
 
 import os
+import threading
 
+import orjson
 from sqlalchemy_mocks import MockEngine, MockStmtSequence, MockVRSObject
 
 from anyvar.restapi.schema import VariationStatisticType
@@ -200,6 +202,220 @@ def test_add_many_items(mocker):
     assert mock_eng.return_value.were_all_execd()
 
 
+def test_add_duplicate_items(mocker):
+    mocker.patch("ga4gh.core.is_pydantic_instance", return_value=True)
+    mock_eng = mocker.patch("anyvar.storage.sql_storage.create_engine")
+    mock_eng.return_value = MockEngine()
+    mock_eng.return_value.add_mock_stmt_sequence(
+        MockStmtSequence()
+        .add_stmt(
+            f"SELECT EXISTS (SELECT 1 FROM pg_catalog.pg_tables WHERE tablename = '{vrs_object_table_name}')",
+            None,
+            [(True,)],
+        )
+        .add_stmt(
+            f"CREATE TEMP TABLE tmp_table (LIKE {vrs_object_table_name} INCLUDING DEFAULTS)",
+            None,
+            [("Table created",)],
+        )
+        .add_copy_from(
+            "tmp_table",
+            "\n".join(
+                [
+                    f"ga4gh:VA.01\t{MockVRSObject('01').to_json()}",
+                    f"ga4gh:VA.02\t{MockVRSObject('02').to_json()}",
+                ]
+            ),
+        )
+        .add_stmt(
+            f"INSERT INTO {vrs_object_table_name} SELECT * FROM tmp_table ON CONFLICT DO NOTHING",
+            None,
+            [(2,)],
+        )
+        .add_stmt("DROP TABLE tmp_table", None, [("Table dropped",)])
+    )
+    sf = PostgresObjectStore("postgres://account/?param=value", 2)
+    with sf.batch_manager(sf):
+        sf["ga4gh:VA.01"] = MockVRSObject("01")
+        sf["ga4gh:VA.01"] = MockVRSObject("01")
+        sf["ga4gh:VA.02"] = MockVRSObject("02")
+    sf.close()
+    assert mock_eng.return_value.were_all_execd()
+
+
+def test_batch_is_per_thread(mocker):
+    """Writes from other threads are not added to a batch another thread is running"""
+    mocker.patch("ga4gh.core.is_pydantic_instance", return_value=True)
+    mock_eng = mocker.patch("anyvar.storage.sql_storage.create_engine")
+    mock_eng.return_value = MockEngine()
+    mock_eng.return_value.add_mock_stmt_sequence(
+        MockStmtSequence()
+        .add_stmt(
+            f"SELECT EXISTS (SELECT 1 FROM pg_catalog.pg_tables WHERE tablename = '{vrs_object_table_name}')",
+            None,
+            [(True,)],
+        )
+        .add_stmt(
+            f"""
+            INSERT INTO {vrs_object_table_name} (vrs_id, vrs_object) VALUES (:vrs_id, :vrs_object) ON CONFLICT DO NOTHING
+            """,
+            {"vrs_id": "ga4gh:VA.02", "vrs_object": MockVRSObject("02").to_json()},
+            [(1,)],
+        )
+        .add_stmt(
+            f"CREATE TEMP TABLE tmp_table (LIKE {vrs_object_table_name} INCLUDING DEFAULTS)",
+            None,
+            [("Table created",)],
+        )
+        .add_copy_from("tmp_table", f"ga4gh:VA.01\t{MockVRSObject('01').to_json()}")
+        .add_stmt(
+            f"INSERT INTO {vrs_object_table_name} SELECT * FROM tmp_table ON CONFLICT DO NOTHING",
+            None,
+            [(1,)],
+        )
+        .add_stmt("DROP TABLE tmp_table", None, [("Table dropped",)])
+    )
+    sf = PostgresObjectStore("postgres://account/?param=value")
+
+    def put_other_item() -> None:
+        sf["ga4gh:VA.02"] = MockVRSObject("02")
+
+    with sf.batch_manager(sf):
+        sf["ga4gh:VA.01"] = MockVRSObject("01")
+        # written right away rather than joining this thread's batch
+        other_thread = threading.Thread(target=put_other_item)
+        other_thread.start()
+        other_thread.join()
+        assert sf.batch_insert_ids == {"ga4gh:VA.01"}
+    sf.close()
+    assert mock_eng.return_value.were_all_execd()
+
+
+def test_add_cached_item_skipped(mocker):
+    """Items already in the read cache are not written again"""
+    location = {
+        "id": "ga4gh:SL.01",
+        "type": "SequenceLocation",
+        "sequenceReference": {
+            "type": "SequenceReference",
+            "refgetAccession": "SQ.ss8r_wB0-b9r44TQTMmVTI92884QvBiB",
+        },
+        "start": 87894076,
+        "end": 87894077,
+    }
+    mocker.patch("ga4gh.core.is_pydantic_instance", return_value=True)
+    mock_eng = mocker.patch("anyvar.storage.sql_storage.create_engine")
+    mock_eng.return_value = MockEngine()
+    mock_eng.return_value.add_mock_stmt_sequence(
+        MockStmtSequence()
+        .add_stmt(
+            f"SELECT EXISTS (SELECT 1 FROM pg_catalog.pg_tables WHERE tablename = '{vrs_object_table_name}')",
+            None,
+            [(True,)],
+        )
+        .add_stmt(
+            f"SELECT vrs_object FROM {vrs_object_table_name} WHERE vrs_id = :vrs_id",
+            {"vrs_id": "ga4gh:SL.01"},
+            [(orjson.dumps(location).decode(),)],
+        )
+    )
+    sf = PostgresObjectStore("postgres://account/?param=value")
+    assert sf["ga4gh:SL.01"].start == 87894076
+    # neither a direct write nor a batched write issues an INSERT
+    sf["ga4gh:SL.01"] = MockVRSObject("01")
+    with sf.batch_manager(sf):
+        sf["ga4gh:SL.01"] = MockVRSObject("01")
+        assert sf.batch_insert_ids == set()
+    sf.close()
+    assert mock_eng.return_value.were_all_execd()
+
+
+def test_get_item_cached(mocker):
+    location = {
+        "id": "ga4gh:SL.01",
+        "type": "SequenceLocation",
+        "sequenceReference": {
+            "type": "SequenceReference",
+            "refgetAccession": "SQ.ss8r_wB0-b9r44TQTMmVTI92884QvBiB",
+        },
+        "start": 87894076,
+        "end": 87894077,
+    }
+    select_statement = (
+        f"SELECT vrs_object FROM {vrs_object_table_name} WHERE vrs_id = :vrs_id"
+    )
+    mock_eng = mocker.patch("anyvar.storage.sql_storage.create_engine")
+    mock_eng.return_value = MockEngine()
+    mock_eng.return_value.add_mock_stmt_sequence(
+        MockStmtSequence()
+        .add_stmt(
+            f"SELECT EXISTS (SELECT 1 FROM pg_catalog.pg_tables WHERE tablename = '{vrs_object_table_name}')",
+            None,
+            [(True,)],
+        )
+        .add_stmt(
+            select_statement,
+            {"vrs_id": "ga4gh:SL.01"},
+            [(orjson.dumps(location).decode(),)],
+        )
+        .add_stmt(
+            f"DELETE FROM {vrs_object_table_name} WHERE vrs_id = :vrs_id",
+            {"vrs_id": "ga4gh:SL.01"},
+            [(1,)],
+        )
+        .add_stmt(
+            select_statement,
+            {"vrs_id": "ga4gh:SL.01"},
+            [(orjson.dumps(location).decode(),)],
+        )
+    )
+    sf = PostgresObjectStore("postgres://account/?param=value")
+    # second read is served from the cache without a query
+    assert sf["ga4gh:SL.01"].start == 87894076
+    assert sf["ga4gh:SL.01"].start == 87894076
+    # delete invalidates the cache, so the next read queries again
+    del sf["ga4gh:SL.01"]
+    assert sf["ga4gh:SL.01"].end == 87894077
+    sf.close()
+    assert mock_eng.return_value.were_all_execd()
+
+
+def test_get_objects(mocker):
+    location = {
+        "id": "ga4gh:SL.01",
+        "type": "SequenceLocation",
+        "sequenceReference": {
+            "type": "SequenceReference",
+            "refgetAccession": "SQ.ss8r_wB0-b9r44TQTMmVTI92884QvBiB",
+        },
+        "start": 87894076,
+        "end": 87894077,
+    }
+    mock_eng = mocker.patch("anyvar.storage.sql_storage.create_engine")
+    mock_eng.return_value = MockEngine()
+    mock_eng.return_value.add_mock_stmt_sequence(
+        MockStmtSequence()
+        .add_stmt(
+            f"SELECT EXISTS (SELECT 1 FROM pg_catalog.pg_tables WHERE tablename = '{vrs_object_table_name}')",
+            None,
+            [(True,)],
+        )
+        .add_stmt(
+            f"SELECT vrs_id, vrs_object FROM {vrs_object_table_name} WHERE vrs_id IN (__[POSTCOMPILE_vrs_ids])",
+            {"vrs_ids": ["ga4gh:SL.01", "ga4gh:SL.02"]},
+            [("ga4gh:SL.01", orjson.dumps(location).decode())],
+        )
+    )
+    sf = PostgresObjectStore("postgres://account/?param=value")
+    objects = sf.get_objects(["ga4gh:SL.01", "ga4gh:SL.02", "ga4gh:SL.01"])
+    assert list(objects) == ["ga4gh:SL.01"]
+    assert objects["ga4gh:SL.01"].start == 87894076
+    # fetched objects are cached
+    assert sf["ga4gh:SL.01"].end == 87894077
+    sf.close()
+    assert mock_eng.return_value.were_all_execd()
+
+
 def test_insertion_count(mocker):
     mock_eng = mocker.patch("anyvar.storage.sql_storage.create_engine")
     mock_eng.return_value = MockEngine()
@@ -1,3 +1,6 @@
+import asyncio
+
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
@@ -23,5 +26,44 @@ def test_lifespan(mocker):
         create_storage_mock.assert_called_once()
         create_translator_mock.assert_called_once()
         assert app.state.anyvar is not None
+        assert app.state.vcf_registrar.av is app.state.anyvar
+        assert isinstance(app.state.vcf_annotate_lock, asyncio.Lock)
+        assert app.state.vcf_semaphore is None
 
     storage_mock.close.assert_called_once()
+
+
+def test_lifespan_threadpool_size(mocker, monkeypatch):
+    """Test that app_lifespan applies ANYVAR_THREADPOOL_SIZE"""
+    mocker.patch("anyvar.anyvar.create_storage")
+    mocker.patch("anyvar.anyvar.create_translator")
+    monkeypatch.setenv("ANYVAR_THREADPOOL_SIZE", "64")
+    app = FastAPI(title="AnyVarTest", lifespan=app_lifespan)
+
+    @app.get("/tokens")
+    async def get_tokens() -> int:
+        return anyio.to_thread.current_default_thread_limiter().total_tokens
+
+    with TestClient(app) as client:
+        assert client.get("/tokens").json() == 64
+
+
+def test_lifespan_vcf_max_concurrent(mocker, monkeypatch):
+    """Test that app_lifespan applies ANYVAR_VCF_MAX_CONCURRENT"""
+    mocker.patch("anyvar.anyvar.create_storage")
+    mocker.patch("anyvar.anyvar.create_translator")
+    monkeypatch.setenv("ANYVAR_VCF_MAX_CONCURRENT", "2")
+    app = FastAPI(title="AnyVarTest", lifespan=app_lifespan)
+    with TestClient(app):
+        assert isinstance(app.state.vcf_semaphore, asyncio.Semaphore)
+        assert app.state.vcf_semaphore._value == 2  # noqa: SLF001
+
+
+def test_lifespan_vcf_max_concurrent_unlimited(mocker, monkeypatch):
+    """Test that app_lifespan treats ANYVAR_VCF_MAX_CONCURRENT <= 0 as no limit"""
+    mocker.patch("anyvar.anyvar.create_storage")
+    mocker.patch("anyvar.anyvar.create_translator")
+    monkeypatch.setenv("ANYVAR_VCF_MAX_CONCURRENT", "0")
+    app = FastAPI(title="AnyVarTest", lifespan=app_lifespan)
+    with TestClient(app):
+        assert app.state.vcf_semaphore is None
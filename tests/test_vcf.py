@@ -1,12 +1,15 @@
 """Test VCF input/output features."""
 
+import asyncio
 import io
 import os
 import pathlib
 import shutil
+import threading
 import time
 from http import HTTPStatus
 
+import httpx
 import pytest
 from billiard.exceptions import TimeLimitExceeded
 from celery.contrib.testing.worker import start_worker
@@ -14,6 +17,7 @@ from celery.exceptions import WorkerLostError
 
 import anyvar.anyvar
 from anyvar.queueing.celery_worker import celery_app
+from anyvar.restapi.main import app
 
 
 @pytest.fixture()
@@ -181,6 +185,59 @@ def test_vcf_registration_async(client, sample_vcf_grch38, mocker):
         shutil.rmtree("tests/tmp_async_work_dir")
 
 
+def test_vcf_sync_annotations_serialized(sample_vcf_grch38, mocker):
+    """Tests that concurrent synchronous VCF annotations run one at a time, since
+    annotation puts the shared object store into batch mode
+    """
+    active = []
+    overlapped = []
+    active_lock = threading.Lock()
+
+    def annotate(vcf_in, vcf_out, **kwargs):  # noqa: ARG001
+        with active_lock:
+            active.append(vcf_out)
+            overlapped.append(len(active) > 1)
+        time.sleep(0.2)
+        pathlib.Path(vcf_out).write_bytes(b"annotated")
+        with active_lock:
+            active.remove(vcf_out)
+
+    mocker.patch.object(app.state, "anyvar", mocker.MagicMock(), create=True)
+    mocker.patch.object(
+        app.state, "vcf_registrar", mocker.MagicMock(annotate=annotate), create=True
+    )
+    mocker.patch.object(app.state, "vcf_annotate_lock", asyncio.Lock(), create=True)
+    mocker.patch.object(app.state, "vcf_semaphore", None, create=True)
+
+    async def put_vcfs() -> list[httpx.Response]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(
+                *(
+                    ac.put("/vcf", files={"vcf": ("test.vcf", sample_vcf_grch38)})
+                    for _ in range(2)
+                )
+            )
+
+    responses = asyncio.run(put_vcfs())
+    assert [resp.status_code for resp in responses] == [HTTPStatus.OK] * 2
+    assert [resp.content for resp in responses] == [b"annotated"] * 2
+    assert overlapped == [False, False]
+
+
+def test_vcf_too_many_uploads(client, sample_vcf_grch38, mocker):
+    """Tests that a 503 is returned when the VCF upload limit is reached"""
+    mocker.patch.object(client.app.state, "vcf_semaphore", asyncio.Semaphore(0))
+    resp = client.put(
+        "/vcf",
+        params={"assembly": "GRCh38"},
+        files={"vcf": ("test.vcf", sample_vcf_grch38)},
+    )
+    assert resp.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert resp.headers["Retry-After"] == "5"
+    assert resp.json()["error_code"] == "TOO_MANY_VCF_UPLOADS"
+
+
 def test_vcf_submit_no_async(client, sample_vcf_grch38, mocker):
     """Tests that a 400 is returned when async processing is not enabled"""
     mocker.patch.dict(
@@ -241,13 +298,16 @@ def test_vcf_get_result_success(client, mocker):
     mock_result = mocker.patch("anyvar.restapi.main.AsyncResult")
     mock_result.return_value.status = "SUCCESS"
     mock_result.return_value.result = __file__
-    mock_bg_tasks = mocker.patch("anyvar.restapi.main.BackgroundTasks.add_task")
+    mock_bg_task = mocker.patch(
+        "anyvar.restapi.main.BackgroundTask", return_value=mocker.AsyncMock()
+    )
     resp = client.get("/vcf/12345")
     assert resp.status_code == HTTPStatus.OK
     with pathlib.Path(__file__).open(mode="rb") as fd:
         assert resp.content == fd.read()
     mock_result.return_value.forget.assert_called_once()
-    mock_bg_tasks.assert_called_with(os.unlink, __file__)
+    mock_bg_task.assert_called_once_with(os.unlink, __file__)
+    mock_bg_task.return_value.assert_awaited_once()
 
 
 def test_vcf_get_result_failure_timeout(client, mocker):
@@ -349,3 +409,14 @@ def test_vcf_get_result_notcomplete(client, mocker):
     assert resp.json()["status"] == "PENDING"
     assert "run_id" in resp.json()
     assert resp.json()["run_id"] == "12345"
+
+
+def test_vcf_get_result_invalid_run_id(client, mocker):
+    """Tests that a malformed run id is rejected without looking up the run"""
+    mocker.patch.dict(
+        os.environ, {"ANYVAR_VCF_ASYNC_WORK_DIR": "./", "CELERY_BROKER_URL": "redis://"}
+    )
+    mock_result = mocker.patch("anyvar.restapi.main.AsyncResult")
+    resp = client.get("/vcf/not a run id")
+    assert resp.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    mock_result.assert_not_called()